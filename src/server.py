@@ -1,18 +1,57 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import AsyncIterator
 
+import orjson
 import uvicorn
-from litestar import Litestar, Request, get, post
+from litestar import Litestar, Request, Response, get, post
+from litestar.datastructures import State
+from litestar.di import Provide
+from litestar.enums import MediaType
+from litestar.response import Stream
+from litestar.serialization import default_serializer
 from litestar.static_files import StaticFilesConfig
 from litestar.status_codes import HTTP_200_OK
 
 from shopeefood_scraper import ShopeeFoodScraper
 
 logger = logging.getLogger(__name__)
-scraper: ShopeeFoodScraper | None = None
 
 BASE_DIR = Path(__file__).resolve().parent
 STATIC_DIR = BASE_DIR / "static"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class ORJSONResponse(Response):
+    """Response that serializes JSON bodies with orjson."""
+
+    def render(self, content, media_type, enc_hook=default_serializer) -> bytes:
+        if media_type == MediaType.JSON and isinstance(content, (dict, list)):
+            try:
+                return orjson.dumps(content)
+            except orjson.JSONEncodeError:
+                pass  # let litestar handle types orjson doesn't know
+        return super().render(content, media_type, enc_hook)
+
+
+@asynccontextmanager
+async def scraper_lifespan(app: Litestar) -> AsyncIterator[None]:
+    """Start one scraper per worker, connecting to BROWSER_WS_ENDPOINT if set."""
+    app.state.scraper = ShopeeFoodScraper()
+    await app.state.scraper.start()
+    try:
+        yield
+    finally:
+        await app.state.scraper.stop()
+
+
+async def provide_scraper(state: State) -> ShopeeFoodScraper:
+    """Inject the app's scraper, restarting its browser if it was closed."""
+    scraper: ShopeeFoodScraper = state.scraper
+    await scraper.start()
+    return scraper
 
 
 @get("/health")
@@ -21,34 +60,27 @@ async def health() -> dict:
 
 
 @post("/init")
-async def init_browser() -> dict:
+async def init_browser(state: State) -> dict:
     """Start the browser manually (optional)."""
-    global scraper
-    if scraper is None:
-        scraper = ShopeeFoodScraper()
+    scraper: ShopeeFoodScraper = state.scraper
+    if scraper.browser is None:
         await scraper.start()
         return {"ok": True, "message": "Browser started"}
     return {"ok": True, "message": "Already running"}
 
 
 @post("/close")
-async def close_browser() -> dict:
+async def close_browser(state: State) -> dict:
     """Stop browser manually."""
-    global scraper
-    if scraper is not None:
+    scraper: ShopeeFoodScraper = state.scraper
+    if scraper.browser is not None:
         await scraper.stop()
-        scraper = None
         return {"ok": True, "message": "Browser stopped"}
     return {"ok": False, "message": "Browser not running"}
 
 
 @get("/restaurants")
-async def get_restaurants(request: Request) -> dict:
-    global scraper
-    if scraper is None:
-        scraper = ShopeeFoodScraper()
-        await scraper.start()
-
+async def get_restaurants(request: Request, scraper: ShopeeFoodScraper) -> dict:
     url = request.query_params.get("url")
     if not url:
         return {"error": "Missing 'url'"}
@@ -61,30 +93,39 @@ async def get_restaurants(request: Request) -> dict:
         return {"ok": False, "error": str(e)}
 
 
-@post("/deals", status_code=HTTP_200_OK)
-async def get_deals(request: Request) -> dict:
-    """Fetch restaurant menu info for a list of URLs."""
-    global scraper
-    if scraper is None:
-        scraper = ShopeeFoodScraper()
-        await scraper.start()
+async def stream_deals(
+    scraper: ShopeeFoodScraper, urls: list[str]
+) -> AsyncIterator[bytes]:
+    """Yield one NDJSON line per restaurant with deals, as soon as it is parsed."""
+    try:
+        async for url, menu_ in scraper.iter_restaurant_menu_infos(urls):
+            deals = await asyncio.to_thread(
+                scraper.batch_parse_special_discounts_from_menu_infos, {url: menu_}
+            )
+            if deals:
+                yield orjson.dumps({"url": url, "deals": deals[url]}) + b"\n"
+    except Exception as e:
+        logger.exception("Failed to fetch menus")
+        yield orjson.dumps({"ok": False, "error": str(e)}) + b"\n"
+
 
+@post("/deals", status_code=HTTP_200_OK)
+async def get_deals(request: Request, scraper: ShopeeFoodScraper) -> Stream:
+    """Stream deals for a list of restaurant URLs as NDJSON."""
     data = await request.json()
     urls = data.get("urls")
     if not urls:
-        return {"error": "Missing 'urls'"}
+        content = [orjson.dumps({"ok": False, "error": "Missing 'urls'"}) + b"\n"]
+        return Stream(content, media_type=NDJSON_MEDIA_TYPE)
 
-    try:
-        menu_infos = await scraper.batch_get_restaurant_menu_infos(urls)
-        deals = scraper.batch_parse_special_discounts_from_menu_infos(menu_infos)
-        return {"ok": True, "deals": deals}
-    except Exception as e:
-        logger.exception("Failed to fetch menus")
-        return {"ok": False, "error": str(e)}
+    return Stream(stream_deals(scraper, urls), media_type=NDJSON_MEDIA_TYPE)
 
 
 app = Litestar(
     route_handlers=[health, init_browser, close_browser, get_restaurants, get_deals],
+    response_class=ORJSONResponse,
+    dependencies={"scraper": Provide(provide_scraper)},
+    lifespan=[scraper_lifespan],
     static_files_config=[
         StaticFilesConfig(path="/", directories=[STATIC_DIR], html_mode=True)
     ],
@@ -93,4 +134,6 @@ if __name__ == "__main__":
     import os
 
     PORT = int(os.getenv("PORT", "8000"))
-    uvicorn.run(app, host="0.0.0.0", port=PORT, reload=False)
+    # each worker launches its own browser unless BROWSER_WS_ENDPOINT is shared
+    WORKERS = int(os.getenv("WORKERS", "1"))
+    uvicorn.run("server:app", host="0.0.0.0", port=PORT, workers=WORKERS, reload=False)
@@ -1,19 +1,76 @@
 import argparse
 import asyncio
-import base64
-import json
+import binascii
 import logging
 import os
-from typing import Callable, Optional
-
+import random
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from operator import itemgetter
+from typing import AsyncIterator, Optional
+from urllib.parse import urlparse
+
+import msgspec
+import orjson
 import zendriver
+from aiolimiter import AsyncLimiter
 from zendriver import cdp
 from zendriver.core.connection import ProtocolException
 
 TIMEOUT = int(os.getenv("TIMEOUT", 10))  # Default timeout for requests in seconds
+BROWSER_WS_ENDPOINT = os.getenv(
+    "BROWSER_WS_ENDPOINT"
+)  # DevTools endpoint of an already running browser to share instead of launching
 MAX_CONCURRENT_TABS = int(
     os.getenv("MAX_CONCURRENT_TABS", 3)
 )  # Max concurrent tabs to open
+PER_HOST_CONCURRENCY = int(
+    os.getenv("PER_HOST_CONCURRENCY", MAX_CONCURRENT_TABS)
+)  # Max concurrent tabs loading pages from the same host
+PER_HOST_RATE = float(
+    os.getenv("PER_HOST_RATE", 0)
+)  # Max page loads per second per host, 0 disables the rate cap
+RETRY_BUDGET_RATE = float(
+    os.getenv("RETRY_BUDGET_RATE", 1)
+)  # Retries per second refilled into the shared retry budget, 0 disables retries
+RETRY_BUDGET_BURST = int(
+    os.getenv("RETRY_BUDGET_BURST", 10)
+)  # Max retries the budget allows in a burst
+MENU_CACHE_TTL = float(
+    os.getenv("MENU_CACHE_TTL", 600)
+)  # Seconds a parsed restaurant menu stays cached
+MENU_CACHE_SIZE = int(
+    os.getenv("MENU_CACHE_SIZE", 512)
+)  # Max number of restaurant menus kept in cache
+# Resources the scraper never needs; only the API XHR/fetch calls matter
+BLOCKED_URL_PATTERNS = [
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.webp",
+    "*.gif",
+    "*.svg",
+    "*.woff",
+    "*.woff2",
+    "*.css",
+    "*google-analytics*",
+    "*googletagmanager*",
+    "*gtag*",
+    "*facebook.net*",
+]
+# ShopeeFood JSON APIs the scraper captures
+DELIVERY_DISHES_API = "/api/dish/get_delivery_dishes"
+RESTAURANT_INFO_API = "/api/delivery/get_infos"
+# Only these responses are paused through the Fetch domain, so the browser never
+# reports the rest of the page traffic to Python
+FETCH_PATTERNS = [
+    cdp.fetch.RequestPattern(
+        url_pattern=f"*{api}*", request_stage=cdp.fetch.RequestStage.RESPONSE
+    )
+    for api in (DELIVERY_DISHES_API, RESTAURANT_INFO_API)
+]
+_get_url = itemgetter("url")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 logging.basicConfig(
     level=LOG_LEVEL, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
@@ -21,122 +78,348 @@ logging.basicConfig(
 
 
 # ---- filter funcs ----
-def filter_delivery_dishes(event: cdp.network.ResponseReceived) -> bool:
-    """Default filter: catch ShopeeFood dish list API"""
-    return "/api/dish/get_delivery_dishes" in event.response.url
+def is_json_response(event: cdp.fetch.RequestPaused) -> bool:
+    """Restaurant info bodies must be JSON, not redirects or error pages"""
+    return any(
+        header.name.lower() == "content-type" and "application/json" in header.value
+        for header in event.response_headers or []
+    )
+
+
+# ---- menu schema ----
+# Only the fields the deal parser reads are declared, msgspec skips the rest
+# of the payload without allocating it.
+class Price(msgspec.Struct, gc=False):
+    value: Optional[int | float] = None
+
+
+class Dish(msgspec.Struct, gc=False):
+    name: Optional[str] = None
+    price: Optional[Price] = None
+    discount_price: Optional[Price] = None
+
+
+class DishType(msgspec.Struct):
+    dishes: list[Dish] = []
+
 
+class MenuReply(msgspec.Struct):
+    menu_infos: Optional[list[DishType]] = None
 
-def filter_restaurant_info(event: cdp.network.ResponseReceived) -> bool:
-    """Catch ShopeeFood restaurant info API"""
-    if "/api/delivery/get_infos" not in event.response.url:
-        return False
-    headers = event.response.headers
-    return "application/json" in headers.get("content-type", "")
+
+class MenuResponse(msgspec.Struct):
+    reply: Optional[MenuReply] = None
+
+
+class MenuProbeReply(msgspec.Struct):
+    menu_infos: Optional[list[msgspec.Raw]] = None
+
+
+class MenuProbe(msgspec.Struct):
+    reply: Optional[MenuProbeReply] = None
+
+
+menu_response_decoder = msgspec.json.Decoder(MenuResponse)
+# checks a payload is a real menu without decoding its dishes
+menu_probe_decoder = msgspec.json.Decoder(MenuProbe)
 
 
 class ShopeeFoodScraper:
     """Manages a single browser instance and multiple concurrent tabs."""
 
     def __init__(
-        self, timeout: int = TIMEOUT, max_concurrent_tabs: int = MAX_CONCURRENT_TABS
+        self,
+        timeout: int = TIMEOUT,
+        max_concurrent_tabs: int = MAX_CONCURRENT_TABS,
+        per_host_concurrency: int = PER_HOST_CONCURRENCY,
+        per_host_rate: float = PER_HOST_RATE,
+        retry_budget_rate: float = RETRY_BUDGET_RATE,
+        retry_budget_burst: int = RETRY_BUDGET_BURST,
+        menu_cache_ttl: float = MENU_CACHE_TTL,
+        menu_cache_size: int = MENU_CACHE_SIZE,
+        browser_endpoint: Optional[str] = BROWSER_WS_ENDPOINT,
     ):
         self.logger = logging.getLogger(__name__)
         self.timeout = timeout
         self.browser: Optional[zendriver.Browser] = None
+        self.browser_endpoint = browser_endpoint
+        # server requests all call start(), don't launch or tear down twice
+        self._browser_lock = asyncio.Lock()
+        self.max_concurrent_tabs = max_concurrent_tabs
+        self._tab_pool: Optional[asyncio.Queue[zendriver.Tab]] = None
+        # every tab we opened, pooled or checked out
+        self._tabs: list[zendriver.Tab] = []
         self.semaphore = asyncio.Semaphore(max_concurrent_tabs)
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_rate = per_host_rate
+        self._host_sems: dict[str, asyncio.Semaphore] = {}
+        self._host_limiters: dict[str, AsyncLimiter] = {}
+        # token bucket of retry_budget_burst retries, refilled at retry_budget_rate/s
+        self._retry_budget: Optional[AsyncLimiter] = None
+        if retry_budget_rate > 0 and retry_budget_burst > 0:
+            self._retry_budget = AsyncLimiter(
+                retry_budget_burst, retry_budget_burst / retry_budget_rate
+            )
+        self.menu_cache_ttl = menu_cache_ttl
+        self.menu_cache_size = menu_cache_size
+        # (url, api_path) -> scrape currently running for it
+        self._inflight: dict[tuple[str, str], asyncio.Task[str | bytes]] = {}
+        # tab target_id -> (api_path, future) of the capture running on that tab
+        self._pending: dict[
+            cdp.target.TargetID, tuple[str, asyncio.Future[tuple[str, str | bytes]]]
+        ] = {}
+        # url -> (cached_at, menu_infos), least recently used first
+        self._menu_cache: OrderedDict[str, tuple[float, list[DishType]]] = OrderedDict()
 
     async def start(self):
-        """Start the browser."""
-        if not self.browser:
-            self.browser = await zendriver.start(
-                headless=False,
-                browser_args=[
-                    "--no-sandbox",
-                    "--disable-gpu",
-                    "--disable-software-rasterizer",
-                    "--disable-dev-shm-usage",
-                ],
-            )
+        """Start or connect to the browser and pre-warm the tab pool."""
+        async with self._browser_lock:
+            if not self.browser:
+                if self.browser_endpoint:
+                    endpoint = urlparse(self.browser_endpoint)
+                    if not endpoint.hostname or not endpoint.port:
+                        # zendriver would silently launch its own browser instead
+                        raise ValueError(
+                            "BROWSER_WS_ENDPOINT needs a host and port, e.g. "
+                            f"ws://127.0.0.1:9222, got {self.browser_endpoint!r}"
+                        )
+                    self.browser = await zendriver.start(
+                        host=endpoint.hostname, port=endpoint.port
+                    )
+                    self.logger.info(f"Connected to browser at {self.browser_endpoint}")
+                else:
+                    self.browser = await zendriver.start(
+                        headless=False,
+                        browser_args=[
+                            "--no-sandbox",
+                            "--disable-gpu",
+                            "--disable-software-rasterizer",
+                            "--disable-dev-shm-usage",
+                            "--blink-settings=imagesEnabled=false",
+                        ],
+                    )
+                    self.logger.info(
+                        f"Browser DevTools endpoint: {self.browser.websocket_url}"
+                    )
+                self._tab_pool = asyncio.Queue()
+                for _ in range(self.max_concurrent_tabs):
+                    self._tab_pool.put_nowait(await self._new_tab())
         return self.browser
 
     async def stop(self):
-        """Stop the browser."""
-        if self.browser:
-            await self.browser.stop()
-            self.browser = None
-
-    def _check_browser(self):
-        if not self.browser:
-            raise RuntimeError("Browser not started. Call start() first.")
-
-    async def _catch_request_core(self, page_url: str, filter_func: Callable) -> str:
-        """Core logic for a single request attempt. Ensures tab is closed."""
-        self._check_browser()
-        # already _check_browser so ignore pyright false positive
+        """Stop the browser, or only close our tabs if the browser is shared."""
+        async with self._browser_lock:
+            if self.browser:
+                if self.browser_endpoint:
+                    # other processes still use this browser, leave it running
+                    # but close our tabs, including ones checked out right now
+                    for tab in self._tabs:
+                        await tab.close()
+                    if self.browser.connection:
+                        await self.browser.connection.aclose()
+                else:
+                    await self.browser.stop()
+                self.browser = None
+                self._tab_pool = None
+                self._tabs.clear()
+
+    async def _new_tab(self) -> zendriver.Tab:
+        """Open a blank tab with API interception on and static assets blocked."""
+        # only called once the browser is up
         tab = await self.browser.get("about:blank", new_tab=True)  # type: ignore
-        if tab is None:
+        if tab is None or tab.target_id is None:
             raise RuntimeError("No tab found")
-        await tab.send(cdp.network.enable())
 
-        done = asyncio.Event()
-        result = {}
+        # register before enabling Fetch, zendriver would otherwise re-enable the
+        # domain without patterns and pause every request
+        tab.add_handler(cdp.fetch.RequestPaused, self._on_request_paused)
+        await tab.send(cdp.fetch.enable(patterns=FETCH_PATTERNS))
+        await tab.send(cdp.network.enable())
+        await tab.send(cdp.network.set_cache_disabled(True))
+        await tab.send(cdp.network.set_blocked_ur_ls(BLOCKED_URL_PATTERNS))
+        self._tabs.append(tab)
+        return tab
+
+    async def _replace_tab(self, tab: zendriver.Tab) -> zendriver.Tab:
+        """Close a tab that failed to navigate and open a fresh one in its place."""
+        self.logger.warning("Tab failed to navigate, replacing it")
+        self._tabs.remove(tab)
+        try:
+            await tab.close()
+        except Exception:
+            pass  # already gone
+        return await self._new_tab()
 
-        async def receive_handler(event: cdp.network.ResponseReceived):
-            if not filter_func(event):
+    async def _on_request_paused(
+        self, event: cdp.fetch.RequestPaused, tab: zendriver.Tab
+    ):
+        """Shared Fetch handler for all pooled tabs, routed by the tab's target id."""
+        target_id = tab.target_id
+        assert target_id is not None  # _new_tab only pools tabs with a target id
+        try:
+            pending = self._pending.get(target_id)
+            if pending is None or event.response_error_reason is not None:
+                return
+            api_path, fut = pending
+            # one-shot: only the first matching response is captured
+            if (
+                fut.done()
+                or api_path not in event.request.url
+                or (api_path == RESTAURANT_INFO_API and not is_json_response(event))
+            ):
                 return
+            # the body is guaranteed to be available while the response is paused
+            body, isbase64 = await tab.send(
+                cdp.fetch.get_response_body(event.request_id)
+            )
+        except ProtocolException:
+            return  # let a later matching response through
+        finally:
             try:
-                body, isbase64 = await tab.send(
-                    cdp.network.get_response_body(event.request_id)
-                )
-            except ProtocolException as e:
-                if (
-                    e.args
-                    and isinstance(e.args[0], dict)
-                    and e.args[0].get("code") == -32000
-                ):
-                    return  # harmless race
-                raise e
-
-            if isbase64:
-                body = base64.b64decode(body).decode("utf-8", errors="replace")
-
-            result["url"] = event.response.url
-            result["data"] = body
-            done.set()
-
-        tab.add_handler(cdp.network.ResponseReceived, receive_handler)
-        await asyncio.sleep(0.5)  # let handler register
-        await tab.get(page_url)
+                await tab.send(cdp.fetch.continue_request(event.request_id))
+            except ProtocolException:
+                pass  # request went away, e.g. the tab navigated
+
+        if isbase64:
+            # kept as bytes, the JSON decoders read UTF-8 bytes directly
+            body = binascii.a2b_base64(body)
+        if not fut.done():
+            fut.set_result((event.request.url, body))
+
+    def _get_cached_menu(self, url: str) -> Optional[list[DishType]]:
+        """Return a cached menu if it has not expired yet."""
+        entry = self._menu_cache.get(url)
+        if entry is None:
+            return None
+        cached_at, menu_ = entry
+        if time.monotonic() - cached_at >= self.menu_cache_ttl:
+            del self._menu_cache[url]
+            return None
+        self._menu_cache.move_to_end(url)
+        return menu_
+
+    def _cache_menu(self, url: str, menu_: list[DishType]):
+        """Cache a parsed menu, evicting the least recently used entries."""
+        self._menu_cache[url] = (time.monotonic(), menu_)
+        self._menu_cache.move_to_end(url)
+        while len(self._menu_cache) > self.menu_cache_size:
+            self._menu_cache.popitem(last=False)
+
+    @asynccontextmanager
+    async def _tab_slot(self, page_url: str):
+        """Hold a per-host and a global slot for one page load."""
+        host = urlparse(page_url).netloc
+        host_sem = self._host_sems.get(host)
+        if host_sem is None:
+            host_sem = self._host_sems[host] = asyncio.Semaphore(
+                self.per_host_concurrency
+            )
+        async with host_sem:
+            if self.per_host_rate > 0:
+                limiter = self._host_limiters.get(host)
+                if limiter is None:
+                    # one load per 1/rate seconds, so fractional rates work too
+                    limiter = self._host_limiters[host] = AsyncLimiter(
+                        1, 1 / self.per_host_rate
+                    )
+                await limiter.acquire()
+            async with self.semaphore:
+                yield
+
+    def _check_browser(self):
+        if not self.browser:
+            raise RuntimeError("Browser not started. Call start() first.")
 
+    async def _catch_request_core(self, page_url: str, api_path: str) -> str | bytes:
+        """Core logic for a single request attempt on a pooled tab."""
+        self._check_browser()
+        # _tab_pool is created together with the browser
+        pool: asyncio.Queue[zendriver.Tab] = self._tab_pool  # type: ignore
+        tab = await pool.get()
+
+        fut: asyncio.Future[tuple[str, str | bytes]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        target_id = tab.target_id
+        assert target_id is not None  # _new_tab only pools tabs with a target id
+        self._pending[target_id] = (api_path, fut)
+        broken = False
         try:
-            await asyncio.wait_for(done.wait(), timeout=self.timeout)
+            try:
+                await tab.get(page_url)
+            except Exception:
+                broken = True
+                raise
+            url, data = await asyncio.wait_for(fut, timeout=self.timeout)
         finally:
-            await tab.close()
-        self.logger.info(f"Captured response from {result.get('url')}")
-        return result.get("data", "")
+            del self._pending[target_id]
+            if not broken:
+                try:
+                    await tab.get("about:blank")
+                except Exception:
+                    broken = True
+            if broken:
+                # a crashed or closed tab would fail every capture that draws it
+                tab = await self._replace_tab(tab)
+            pool.put_nowait(tab)
+        self.logger.info(f"Captured response from {url}")
+        return data
 
     async def catch_request(
         self,
         page_url: str,
-        filter_func: Callable,
+        api_path: str,
         retries: int = 2,
         backoff: float = 1.0,
-    ) -> str:
-        """Wrap core request with retries and semaphore control."""
+    ) -> str | bytes:
+        """Catch an API response, joining an identical scrape already in flight."""
         self._check_browser()
 
+        key = (page_url, api_path)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._catch_request_with_retries(page_url, api_path, retries, backoff)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield so one cancelled caller does not cancel the scrape for the others
+        return await asyncio.shield(task)
+
+    async def _catch_request_with_retries(
+        self,
+        page_url: str,
+        api_path: str,
+        retries: int,
+        backoff: float,
+    ) -> str | bytes:
+        """Wrap core request with retries and per-host/global concurrency control."""
         attempt = 0
         while attempt <= retries:
             attempt += 1
-            async with self.semaphore:
+            async with self._tab_slot(page_url):
                 try:
-                    return await self._catch_request_core(page_url, filter_func)
+                    return await self._catch_request_core(page_url, api_path)
                 except asyncio.TimeoutError:
                     self.logger.warning(
                         f"Timeout on attempt {attempt}/{retries} for {page_url}"
                     )
                     if attempt <= retries:
-                        delay = backoff * (2 ** (attempt - 1))
+                        # shared budget so a burst of timeouts can't multiply scrapes
+                        budget = self._retry_budget
+                        if budget is None:
+                            self.logger.error(
+                                f"Retries disabled, giving up on {page_url}"
+                            )
+                            return ""
+                        if not budget.has_capacity():
+                            self.logger.error(
+                                f"Retry budget exhausted, giving up on {page_url}"
+                            )
+                            return ""
+                        await budget.acquire()
+                        # full jitter spreads out URLs that timed out together
+                        delay = random.uniform(0, backoff * (2 ** (attempt - 1)))
                         self.logger.info(f"Retrying in {delay:.1f}s...")
                         await asyncio.sleep(delay)
                     else:
@@ -146,7 +429,7 @@ class ShopeeFoodScraper:
 
     @staticmethod
     def batch_parse_special_discounts_from_menu_infos(
-        menu_infos: dict[str, dict], price_threshold=100
+        menu_infos: dict[str, list[DishType]], price_threshold=100
     ) -> dict[str, list[dict]]:
         """Parse restaurant menu infos for great deals without duplicates."""
 
@@ -154,27 +437,30 @@ class ShopeeFoodScraper:
         for url_, menu in menu_infos.items():
             seen = set()
             good_deals = []
+            # bound locally, this loop runs for every dish of every menu
+            seen_add = seen.add
+            append = good_deals.append
             for dish_type in menu:
-                for item in dish_type.get("dishes", []):
-                    discount_price = item.get("discount_price", {}).get("value")
+                for item in dish_type.dishes:
+                    if item.discount_price is None:
+                        continue
+                    discount_price = item.discount_price.value
                     if discount_price is None or discount_price >= price_threshold:
                         continue
 
-                    key = (
-                        item.get("name"),
-                        item.get("price", {}).get("value"),
-                        discount_price,
+                    name = item.name
+                    original_price = item.price.value if item.price else None
+                    key = (name, original_price, discount_price)
+                    if key in seen:
+                        continue
+                    seen_add(key)
+                    append(
+                        {
+                            "name": name,
+                            "original_price": original_price,
+                            "discount_price": discount_price,
+                        }
                     )
-
-                    if key not in seen:
-                        seen.add(key)
-                        good_deals.append(
-                            {
-                                "name": item.get("name"),
-                                "original_price": item.get("price", {}).get("value"),
-                                "discount_price": discount_price,
-                            }
-                        )
             if good_deals:
                 special_deals[url_] = good_deals
         return special_deals
@@ -182,47 +468,135 @@ class ShopeeFoodScraper:
     @staticmethod
     def extract_restaurant_urls(restaurant_items: dict):
         """Extract restaurant URLs from the search result JSON."""
-        return [res["url"] for res in restaurant_items["reply"]["delivery_infos"]]
+        return list(map(_get_url, restaurant_items["reply"]["delivery_infos"]))
+
+    def parse_menu(
+        self, url: str, restaurant_data: str | bytes
+    ) -> Optional[list[DishType]]:
+        """Decode a dish list API payload into its menu sections.
+
+        Returns None when the payload is not valid JSON, not a menu (e.g. an API
+        error body) or does not match the menu schema.
+        """
+        if isinstance(restaurant_data, bytes):
+            has_discount = b'"discount_price"' in restaurant_data
+        else:
+            has_discount = '"discount_price"' in restaurant_data
+        try:
+            if not has_discount:
+                # nothing can be a deal, only confirm this is a real menu
+                reply = menu_probe_decoder.decode(restaurant_data).reply
+                if reply is None or reply.menu_infos is None:
+                    return None
+                return []
+            reply = menu_response_decoder.decode(restaurant_data).reply
+        except msgspec.DecodeError as e:
+            self.logger.error(f"Invalid menu payload from {url}: {e}")
+            return None
+        if reply is None or reply.menu_infos is None:
+            return None
+        return reply.menu_infos
 
     async def get_restaurant_links_from_search(self, search_url: str) -> list[str]:
         """Get restaurant links from a search URL."""
         self._check_browser()
         restaurant_items = await self.catch_request(
             search_url,
-            filter_restaurant_info,
+            RESTAURANT_INFO_API,
         )
         if not restaurant_items:
             self.logger.info("No restaurant data found.")
             return []
-        restaurant_urls = self.extract_restaurant_urls(json.loads(restaurant_items))
+        restaurant_urls = self.extract_restaurant_urls(
+            await asyncio.to_thread(orjson.loads, restaurant_items)
+        )
         self.logger.info(f"Found restaurants in {search_url}: {restaurant_urls}")
         return restaurant_urls
 
-    async def batch_get_restaurant_menu_infos(
+    async def iter_restaurant_menu_infos(
         self, restaurant_urls: list[str], max_concurrent: int = MAX_CONCURRENT_TABS
-    ) -> dict[str, dict]:
-        """Get menu info from a list of restaurant URLs."""
+    ) -> AsyncIterator[tuple[str, list[DishType]]]:
+        """Yield (url, menu) pairs as soon as each restaurant's menu is ready."""
         self._check_browser()
+        restaurant_urls = list(dict.fromkeys(restaurant_urls))  # drop duplicates
 
-        # Limit concurrent tabs
-        semaphore = asyncio.Semaphore(max_concurrent)
-
-        async def limited_catch(url):
-            async with semaphore:
-                return await self.catch_request(url, filter_delivery_dishes)
-
-        tasks = [limited_catch(url) for url in restaurant_urls]
-        results = await asyncio.gather(*tasks)
-
-        menu_infos = {}
-        for url, restaurant_data in zip(restaurant_urls, results):
-            if not restaurant_data:
+        # None marks that every worker has finished
+        menu_queue: asyncio.Queue[Optional[tuple[str, list[DishType]]]] = (
+            asyncio.Queue()
+        )
+        misses = []
+        hits = 0
+        for url in restaurant_urls:
+            menu_ = self._get_cached_menu(url)
+            if menu_ is None:
+                misses.append(url)
                 continue
-
-            menu_ = json.loads(restaurant_data).get("reply", {}).get("menu_infos", {})
+            hits += 1
             if menu_:
-                menu_infos[url] = menu_
-        return menu_infos
+                # queued ahead of scraped menus, yielded once the workers run
+                menu_queue.put_nowait((url, menu_))
+        if hits:
+            self.logger.info(f"Menu cache hits: {hits}/{len(restaurant_urls)}")
+
+        # A fixed number of workers drain the queue, which limits concurrent tabs
+        # without creating a task per URL
+        url_queue: asyncio.Queue[str] = asyncio.Queue()
+        for url in misses:
+            url_queue.put_nowait(url)
+
+        async def worker():
+            while not url_queue.empty():
+                url = url_queue.get_nowait()
+                restaurant_data = await self.catch_request(url, DELIVERY_DISHES_API)
+                if not restaurant_data:
+                    continue
+                # decode off the event loop so other tabs keep being serviced
+                menu_ = await asyncio.to_thread(self.parse_menu, url, restaurant_data)
+                if menu_ is None:
+                    # error or empty reply, don't let it hide the restaurant
+                    continue
+                self._cache_menu(url, menu_)
+                if menu_:
+                    menu_queue.put_nowait((url, menu_))
+
+        # start scraping before handing out cache hits, so a slow consumer of
+        # the hits doesn't delay the misses
+        worker_tasks = [
+            asyncio.ensure_future(worker())
+            for _ in range(min(max_concurrent, len(misses)))
+        ]
+
+        async def run_workers():
+            try:
+                await asyncio.gather(*worker_tasks)
+            finally:
+                # gather returns on the first error, stop the other workers too
+                for task in worker_tasks:
+                    if not task.done():
+                        task.cancel()
+                menu_queue.put_nowait(None)
+
+        workers = asyncio.ensure_future(run_workers())
+        try:
+            await asyncio.sleep(0)  # let the workers pick up their first URLs
+            while (item := await menu_queue.get()) is not None:
+                yield item
+            await workers  # surface worker errors
+        finally:
+            workers.cancel()
+
+    async def batch_get_restaurant_menu_infos(
+        self, restaurant_urls: list[str], max_concurrent: int = MAX_CONCURRENT_TABS
+    ) -> dict[str, list[DishType]]:
+        """Get menu info from a list of restaurant URLs, using cached menus if fresh."""
+        menu_infos = {
+            url: menu_
+            async for url, menu_ in self.iter_restaurant_menu_infos(
+                restaurant_urls, max_concurrent
+            )
+        }
+        # keep the caller's ordering
+        return {url: menu_infos[url] for url in restaurant_urls if url in menu_infos}
 
 
 async def main(init_url: str):
@@ -232,18 +606,22 @@ async def main(init_url: str):
     scraper = ShopeeFoodScraper()
     await scraper.start()
     restaurant_urls = await scraper.get_restaurant_links_from_search(init_url)
-    menu_infos = await scraper.batch_get_restaurant_menu_infos(restaurant_urls)
+    # parse each menu as it arrives, overlapping with the remaining scrapes
+    special_deals = {}
+    async for url, menu_ in scraper.iter_restaurant_menu_infos(restaurant_urls):
+        special_deals.update(
+            scraper.batch_parse_special_discounts_from_menu_infos({url: menu_})
+        )
     await scraper.stop()
 
-    special_deals = scraper.batch_parse_special_discounts_from_menu_infos(menu_infos)
     if special_deals:
-        scraper.logger.info(json.dumps(special_deals, indent=2, ensure_ascii=False))
+        scraper.logger.info(
+            orjson.dumps(special_deals, option=orjson.OPT_INDENT_2).decode()
+        )
     return special_deals
 
 
 if __name__ == "__main__":
-    import time
-
     parser = argparse.ArgumentParser(description="ShopeeFood scraper")
     parser.add_argument(
         "init_url", type=str, help="Initial ShopeeFood search URL to scrape"